@@ -1,7 +1,10 @@
 import pygame
 import time
 import json
+import zlib
 from states import MainMenu
+from leaderboard import HttpBackend, LeaderboardClient
+from ghosts import Trajectory, GhostStore
 from settings import *
 
 
@@ -28,8 +31,11 @@ class Game():
 
         # Data which needs to be store
         self.player_name: str = "player_1"
-        self.reset_score()
         self.sl_manager = SaveLoadManager()
+        self.leaderboard = LeaderboardClient(HttpBackend(LEADERBOARD_URL)) if LEADERBOARD_URL else None
+        self.ghost_store = GhostStore()
+        self.ghost_store.load_data()
+        self.reset_score()
 
         # State
         self.state_stack = []
@@ -88,15 +94,51 @@ class Game():
     def reset_score(self):
         self.score: int = 0
         self.start_offset: int = pygame.time.get_ticks()
+        self.trajectory = Trajectory()
+        # One course per day, so that ghosts race on the course they flew
+        self.course_seed: int = int(time.strftime("%Y%m%d"))
+        if self.leaderboard is not None:
+            self.leaderboard.set_course(self.course_seed)
     
     def update_score(self):
         self.score = (pygame.time.get_ticks() - self.start_offset) // 1000
     
     def load_score(self):
         self.sl_manager.load_data()
+        if self.leaderboard is not None:
+            self.leaderboard.refresh()
     
     def save_score(self):
         self.sl_manager.save_data((self.player_name, self.score))
+        self.ghost_store.save_data((self.player_name, self.course_seed, self.trajectory))
+        if self.leaderboard is not None:
+            self.leaderboard.submit(self.player_name, self.score, self.course_seed, self.trajectory.encode())
+    
+    def ghost_trajectories(self):
+        """Return the player's best runs and the leaderboard's best runs on the current course."""
+        trajectories = self.ghost_store.trajectories(self.course_seed)
+        if self.leaderboard is not None:
+            for name, data in self.leaderboard.ghosts:
+                # The player's own runs are already replayed from ghosts.json
+                if name == self.player_name:
+                    continue
+                try:
+                    trajectories.append(Trajectory.decode(data))
+                except (ValueError, zlib.error):
+                    pass
+        return trajectories
+    
+    def get_ranking(self):
+        """Return the leaderboard ranking if it is available, the local one otherwise."""
+        if self.leaderboard is not None:
+            ranking = self.leaderboard.ranking
+            if ranking:
+                return ranking
+        return self.sl_manager.ranking
+    
+    def close(self):
+        if self.leaderboard is not None:
+            self.leaderboard.close()
 
 
 class SaveLoadManager():
@@ -150,5 +192,6 @@ if __name__ == "__main__":
     while g.running:
         g.playing = True
         g.game_loop()
+    g.close()
 
 
@@ -0,0 +1,97 @@
+import base64
+import json
+import sys
+import zlib
+from array import array
+
+from settings import *
+
+
+
+class Trajectory():
+    """This class stores the path of the plane during a run.
+
+    Only the y position is kept, sampled every GHOST_TICK seconds as 16-bit integers.
+    The speed needed to rotate the ghost is recovered from two consecutive samples.
+    """
+    def __init__(self, samples=None) -> None:
+        self.samples = array('h', samples or [])
+        self.elapsed: float = 0.
+
+    @property
+    def duration(self) -> float:
+        return max(len(self.samples) - 1, 0) * GHOST_TICK
+
+    def record(self, dt: float, y: float) -> None:
+        self.elapsed += dt
+        while len(self.samples) * GHOST_TICK <= self.elapsed:
+            self.samples.append(max(-32768, min(32767, round(y))))
+
+    def sample(self, t: float):
+        """Return (y, direction) at time t, or None once the run is over."""
+        position = t / GHOST_TICK
+        i = int(position)
+        if i + 1 >= len(self.samples):
+            return None
+        y0, y1 = self.samples[i], self.samples[i + 1]
+        return y0 + (y1 - y0) * (position - i), (y1 - y0) / GHOST_TICK
+
+    def encode(self) -> str:
+        samples = array('h', self.samples)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return base64.b64encode(zlib.compress(samples.tobytes())).decode()
+
+    @classmethod
+    def decode(cls, data: str):
+        samples = array('h')
+        samples.frombytes(zlib.decompress(base64.b64decode(data)))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return cls(samples)
+
+
+class GhostStore():
+    # Manage ghosts
+    # Save the trajectories of the GHOST_COUNT best runs
+    # Remember the course (obstacle seed) of each run
+    def __init__(self):
+        self.filename = GHOST_FILE
+        self.runs = []
+        self.TOP_K = GHOST_COUNT
+
+    def load_data(self):
+        try:
+            with open(self.filename, "r") as file:
+                self.runs = [(name, seed, Trajectory.decode(data)) for name, seed, data in json.load(file)]
+        except (OSError, ValueError, TypeError, zlib.error):
+            self.runs = []
+
+    def save_data(self, data):
+        """Add the new run to the best runs and save them if it is one of them."""
+        if self.update_runs(data):
+            with open(self.filename, "w+") as file:
+                json.dump([(name, seed, trajectory.encode()) for name, seed, trajectory in self.runs], file)
+
+    def update_runs(self, data):
+        """Keep the TOP_K longest runs on the course of the new run, best first.
+
+        Runs are ranked by the time actually flown, so the time spent in pause doesn't count.
+        Runs on other courses are dropped, they can't be raced anymore.
+        Args:
+            data, a tuple (name, course_seed, trajectory)
+        Returns:
+            True if the new run is kept.
+        """
+        if len(data[2].samples) < 2:
+            return False
+        runs = [run for run in self.runs if run[1] == data[1]] + [data]
+        runs = sorted(runs, key=lambda run: run[2].duration, reverse=True)[:self.TOP_K]
+        if not any(run is data for run in runs):
+            return False
+        self.runs = runs
+        return True
+
+    def trajectories(self, course_seed):
+        """Return the trajectories recorded on the given course."""
+        return [trajectory for _, seed, trajectory in self.runs if seed == course_seed]
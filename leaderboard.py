@@ -0,0 +1,312 @@
+import gzip
+from abc import ABC, abstractmethod
+import json
+import os
+import random
+import threading
+import time
+import traceback
+import http.client
+from urllib.parse import urlsplit
+
+from settings import *
+
+
+
+class LeaderboardRejected(Exception):
+    """Raised when the leaderboard refuses a request for good.
+
+    Sending the same request again would fail the same way, so it must not be retried.
+    """
+
+
+class LeaderboardBackend(ABC):
+    """Base class for leaderboard backends.
+
+    A valid backend implements two functions:
+        -submit_batch(entries): send a list of (name, score) to the leaderboard.
+            An entry can also be (name, score, course, trajectory) to share the run as a ghost.
+        -fetch_top(n): return the n best (name, score), best first.
+    It may also implement fetch_ghosts(course, n), which returns the n longest
+    (name, encoded trajectory) on a course. By default, there are no ghosts.
+    These functions raise LeaderboardRejected if the leaderboard refuses the request for good,
+    and any other exception if it cannot be reached for now.
+    """
+    @abstractmethod
+    def submit_batch(self, entries: list) -> None:
+        pass
+
+    @abstractmethod
+    def fetch_top(self, n: int) -> list:
+        pass
+
+    def fetch_ghosts(self, course: int, n: int) -> list:
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+class HttpBackend(LeaderboardBackend):
+    """This class talks to a leaderboard server over HTTP or HTTPS.
+
+    The connection is kept alive and reused between requests.
+    Submissions are sent as gzip compressed JSON.
+    """
+    def __init__(self, url: str, timeout: float = LEADERBOARD_TIMEOUT, keep_alive: bool = True) -> None:
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            self.connection_class = http.client.HTTPSConnection
+        elif parts.scheme == "http":
+            self.connection_class = http.client.HTTPConnection
+        else:
+            raise ValueError(f"Unsupported leaderboard URL scheme: {url}")
+        self.host: str = parts.hostname
+        self.port: int = parts.port or self.connection_class.default_port
+        self.path: str = parts.path.rstrip("/")
+        self.timeout: float = timeout
+        self.keep_alive: bool = keep_alive
+        self.connection = None
+
+    def submit_batch(self, entries: list) -> None:
+        body = gzip.compress(json.dumps({"scores": [list(entry) for entry in entries]}).encode())
+        self.request("POST", "/scores", body, {"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    def fetch_top(self, n: int) -> list:
+        data = self.request("GET", f"/top?n={n}")
+        return [(name, score) for name, score in data["top"]]
+
+    def fetch_ghosts(self, course: int, n: int) -> list:
+        data = self.request("GET", f"/ghosts?course={course}&n={n}")
+        return [(name, trajectory) for name, trajectory in data["ghosts"]]
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None) -> dict:
+        headers = dict(headers or {})
+        headers["Accept-Encoding"] = "gzip"
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        # A kept alive connection may have been closed by the server meanwhile,
+        # so retry once on a fresh connection before giving up
+        for attempt in range(2):
+            reused = self.connection is not None
+            if self.connection is None:
+                self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, self.path + path, body, headers)
+                response = self.connection.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                self.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except OSError:
+                self.close()
+                raise
+            if not self.keep_alive or response.will_close:
+                self.close()
+            # Client errors are permanent, except timeouts and rate limiting
+            if 400 <= response.status < 500 and response.status not in (408, 429):
+                raise LeaderboardRejected(f"{method} {path}: {response.status} {response.reason}")
+            if response.status != 200:
+                raise http.client.HTTPException(f"{method} {path}: {response.status} {response.reason}")
+            if response.getheader("Content-Encoding") == "gzip":
+                payload = gzip.decompress(payload)
+            return json.loads(payload)
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class LeaderboardClient():
+    """This class reports scores to a leaderboard without blocking the game.
+
+    Scores are queued and sent by batches from a background thread.
+    If the leaderboard cannot be reached, the queue is kept (and saved on disk)
+    and the submission is retried later with an exponential backoff.
+    The top N and the ghosts of the current course are cached and refreshed in the background,
+    so reading them never waits on the network.
+    """
+    def __init__(self, backend: LeaderboardBackend, queue_file: str = LEADERBOARD_QUEUE_FILE,
+                 top_n: int = LEADERBOARD_TOP_N, batch_size: int = LEADERBOARD_BATCH_SIZE,
+                 flush_interval: float = LEADERBOARD_FLUSH_INTERVAL,
+                 refresh_interval: float = LEADERBOARD_REFRESH_INTERVAL,
+                 max_backoff: float = LEADERBOARD_MAX_BACKOFF, ghost_count: int = GHOST_COUNT) -> None:
+        self.backend: LeaderboardBackend = backend
+        self.queue_file: str = queue_file
+        self.TOP_N: int = top_n
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.refresh_interval: float = refresh_interval
+        self.max_backoff: float = max_backoff
+        self.ghost_count: int = ghost_count
+        # Shared with the worker
+        self.lock = threading.Condition()
+        self.file_lock = threading.Lock()
+        self.pending: list = self.load_queue()
+        self.top: list = []
+        self.course = None
+        self.ghost_runs: list = []
+        self.refresh_requested: bool = True
+        self.running: bool = True
+        # Retry
+        self.failures: int = 0
+        self.next_attempt: float = 0.
+        self.next_refresh: float = 0.
+        # Worker
+        self.worker = threading.Thread(target=self.run, name="leaderboard", daemon=True)
+        self.worker.start()
+
+    @property
+    def ranking(self) -> dict:
+        """Return the cached top N with the same layout as SaveLoadManager.ranking."""
+        with self.lock:
+            top = list(self.top)
+        return {name: score for name, score in reversed(top)}
+
+    @property
+    def ghosts(self) -> list:
+        """Return the cached (name, encoded trajectory) of the longest runs on the current course."""
+        with self.lock:
+            return list(self.ghost_runs)
+
+    def set_course(self, course: int) -> None:
+        """Fetch the ghosts of this course from now on."""
+        with self.lock:
+            if course != self.course:
+                self.course = course
+                self.ghost_runs = []
+                self.refresh_requested = True
+                self.lock.notify()
+
+    def submit(self, name: str, score: int, course: int = None, trajectory: str = None) -> None:
+        """Queue a score, with the encoded trajectory of the run to share it as a ghost."""
+        with self.lock:
+            self.pending.append((name, score) if trajectory is None else (name, score, course, trajectory))
+            self.lock.notify()
+        self.save_queue()
+
+    def refresh(self) -> None:
+        """Ask the worker to fetch the top N as soon as possible."""
+        with self.lock:
+            self.refresh_requested = True
+            self.lock.notify()
+
+    def close(self, timeout: float = LEADERBOARD_TIMEOUT) -> None:
+        """Stop the worker after a last flush and save what could not be sent."""
+        with self.lock:
+            self.running = False
+            self.next_attempt = 0.
+            self.lock.notify()
+        self.worker.join(timeout)
+        self.save_queue()
+        # The worker may still be waiting on the network, the backend is its own then
+        if not self.worker.is_alive():
+            self.backend.close()
+
+    def run(self) -> None:
+        while True:
+            try:
+                if not self.step():
+                    return
+            except Exception:
+                # Never let the worker die, nothing would be sent until the game restarts
+                traceback.print_exc()
+                with self.lock:
+                    if not self.running:
+                        return
+                    self.backoff()
+                    self.next_refresh = time.monotonic() + self.refresh_interval
+
+    def step(self) -> bool:
+        """Send a batch and/or refresh the top N. Return False once the worker must stop."""
+        with self.lock:
+            while self.running and not self.has_work():
+                self.lock.wait(self.time_to_wait())
+            running = self.running
+            batch = self.pending[:self.batch_size] if time.monotonic() >= self.next_attempt else []
+            refresh = running and (self.refresh_requested or time.monotonic() >= self.next_refresh)
+            self.refresh_requested = False
+        if batch:
+            self.flush(batch)
+        if refresh:
+            self.fetch()
+        return running or (bool(batch) and not self.failures)
+
+    def has_work(self) -> bool:
+        now = time.monotonic()
+        return (bool(self.pending) and now >= self.next_attempt) \
+            or self.refresh_requested or now >= self.next_refresh
+
+    def time_to_wait(self) -> float:
+        now = time.monotonic()
+        wait = self.next_refresh - now
+        if self.pending:
+            wait = min(wait, self.next_attempt - now)
+        return max(wait, 0.)
+
+    def flush(self, batch: list) -> None:
+        try:
+            self.backend.submit_batch(batch)
+            sent = True
+        except LeaderboardRejected:
+            # Drop the batch, otherwise it would block every later score
+            sent = False
+        except Exception:
+            with self.lock:
+                self.backoff()
+            return
+        with self.lock:
+            del self.pending[:len(batch)]
+            self.failures = 0
+            # Send the remaining scores right away, otherwise wait for more
+            if len(self.pending) >= self.batch_size or not self.running:
+                self.next_attempt = 0.
+            else:
+                self.next_attempt = time.monotonic() + self.flush_interval
+            self.refresh_requested = self.refresh_requested or sent
+        self.save_queue()
+
+    def fetch(self) -> None:
+        with self.lock:
+            course = self.course
+        try:
+            top = self.backend.fetch_top(self.TOP_N)
+            ghost_runs = self.backend.fetch_ghosts(course, self.ghost_count) if course is not None else []
+        except Exception:
+            with self.lock:
+                self.next_refresh = time.monotonic() + self.refresh_interval
+            return
+        with self.lock:
+            self.top = top
+            # The course may have changed meanwhile
+            if course == self.course:
+                self.ghost_runs = ghost_runs
+            self.next_refresh = time.monotonic() + self.refresh_interval
+
+    def backoff(self) -> None:
+        self.failures += 1
+        # Stop doubling once the maximum is reached, 2 ** failures would overflow a float
+        delay = min(self.flush_interval * 2 ** min(self.failures, 16), self.max_backoff)
+        self.next_attempt = time.monotonic() + random.uniform(delay / 2, delay)
+
+    def load_queue(self) -> list:
+        try:
+            with open(self.queue_file, "r") as file:
+                return [tuple(entry) for entry in json.load(file)]
+        except (OSError, ValueError, TypeError):
+            return []
+
+    def save_queue(self) -> None:
+        """Write the pending scores to disk, without holding the lock used by ranking."""
+        with self.file_lock:
+            with self.lock:
+                pending = list(self.pending)
+            try:
+                with open(self.queue_file + ".tmp", "w+") as file:
+                    json.dump(pending, file)
+                os.replace(self.queue_file + ".tmp", self.queue_file)
+            except OSError:
+                pass
@@ -0,0 +1,81 @@
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from leaderboard import HttpBackend
+from leaderboard_server import make_server
+
+
+
+def run_client(url: str, n_scores: int, batch_size: int, keep_alive: bool, latencies: list, errors: list, accepted: list) -> None:
+    """Submit n_scores random scores by batches and record the latency of each request."""
+    backend = HttpBackend(url, keep_alive=keep_alive)
+    name = threading.current_thread().name
+    try:
+        for start in range(0, n_scores, batch_size):
+            batch = [(f"{name}_{i % 20}", random.randint(0, 500)) for i in range(start, min(start + batch_size, n_scores))]
+            before = time.perf_counter()
+            try:
+                backend.submit_batch(batch)
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - before)
+            accepted.append(len(batch))
+        try:
+            backend.fetch_top(10)
+        except Exception as e:
+            errors.append(e)
+    finally:
+        backend.close()
+
+
+def load_test(url: str, clients: int, n_scores: int, batch_size: int, keep_alive: bool) -> dict:
+    latencies, errors, accepted = [], [], []
+    threads = [threading.Thread(target=run_client, name=f"cabinet{i}", args=(url, n_scores, batch_size, keep_alive, latencies, errors, accepted))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "accepted": sum(accepted),
+        "scores_per_s": sum(accepted) / elapsed,
+        "p50_ms": 1000 * statistics.median(latencies) if latencies else 0.,
+        "p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the leaderboard client.")
+    parser.add_argument("--url", default="", help="leaderboard to hit, a local server is started if empty")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--scores", type=int, default=2000, help="scores submitted by each client")
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--no-keep-alive", action="store_true", help="open a new connection for each request")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = load_test(url, args.clients, args.scores, args.batch, not args.no_keep_alive)
+    print(f"{args.clients} clients x {args.scores} scores, batch {args.batch}, keep-alive {not args.no_keep_alive}")
+    print(f"{results['requests']} requests ({results['errors']} errors) in {results['elapsed']:.2f}s")
+    print(f"{results['scores_per_s']:.0f} scores/s, p50 {results['p50_ms']:.2f}ms, p95 {results['p95_ms']:.2f}ms")
+
+    if server is not None:
+        print(f"server received {server.store.submitted} scores, {results['accepted']} acknowledged")
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,185 @@
+import argparse
+import gzip
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from ghosts import Trajectory
+from settings import *
+
+
+
+class ScoreStore():
+    """This class keeps the best score of each player.
+
+    Same rule as SaveLoadManager: a player only keeps their best score.
+    It also keeps the longest run of each player on each course, to be replayed as a ghost.
+    """
+    def __init__(self, filename: str = None) -> None:
+        self.filename: str = filename
+        self.scores: dict = {}
+        # {course: {name: (duration, encoded trajectory)}}
+        self.ghosts: dict = {}
+        self.submitted: int = 0
+        self.lock = threading.Lock()
+        self.load_data()
+
+    def load_data(self) -> None:
+        if self.filename is None:
+            return
+        try:
+            with open(self.filename, "r") as file:
+                data = json.load(file)
+            self.scores = data["scores"]
+            self.ghosts = {int(course): {name: tuple(run) for name, run in runs.items()}
+                           for course, runs in data["ghosts"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    def save_data(self) -> None:
+        if self.filename is None:
+            return
+        with self.lock:
+            data = {"scores": dict(self.scores), "ghosts": {course: dict(runs) for course, runs in self.ghosts.items()}}
+        with open(self.filename, "w+") as file:
+            json.dump(data, file)
+
+    def add_scores(self, entries: list) -> None:
+        with self.lock:
+            for name, score in entries:
+                if score > self.scores.get(name, score - 1):
+                    self.scores[name] = score
+            self.submitted += len(entries)
+
+    def add_ghosts(self, runs: list) -> None:
+        """Keep the longest run of each player on each course.
+
+        Args:
+            runs, a list of (name, course, duration, encoded trajectory)
+        """
+        with self.lock:
+            for name, course, duration, data in runs:
+                course_runs = self.ghosts.setdefault(course, {})
+                if duration > course_runs.get(name, (0., None))[0]:
+                    course_runs[name] = (duration, data)
+
+    def top(self, n: int) -> list:
+        with self.lock:
+            ranking = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+        return ranking[:n]
+
+    def top_ghosts(self, course: int, n: int) -> list:
+        with self.lock:
+            runs = sorted(self.ghosts.get(course, {}).items(), key=lambda item: item[1][0], reverse=True)
+        return [(name, data) for name, (_, data) in runs[:n]]
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    """This class serves the leaderboard API used by leaderboard.HttpBackend.
+
+    -POST /scores: body {"scores": [[name, score], ...]}, optionally gzip compressed.
+        An entry can also be [name, score, course, trajectory] to share the run as a ghost.
+    -GET /top?n=10: returns {"top": [[name, score], ...]}, best first.
+    -GET /ghosts?course=20260101&n=3: returns {"ghosts": [[name, trajectory], ...]}, longest first.
+    HTTP/1.1 is used so that clients can keep their connection alive.
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body can't be skipped, so the connection can't be reused
+            self.close_connection = True
+            self.send_json(400, {"error": "bad request"})
+            return
+        # Always read the body, otherwise it would be parsed as the next request
+        body = self.rfile.read(length)
+        if urlsplit(self.path).path != "/scores":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            entries, runs = [], []
+            for entry in json.loads(body)["scores"]:
+                name, score = str(entry[0]), int(entry[1])
+                entries.append((name, score))
+                if len(entry) == 4 and entry[3] is not None:
+                    trajectory = Trajectory.decode(entry[3])
+                    if trajectory.duration > 0.:
+                        runs.append((name, int(entry[2]), trajectory.duration, trajectory.encode()))
+        except (OSError, EOFError, zlib.error, ValueError, KeyError, TypeError, IndexError):
+            self.send_json(400, {"error": "bad request"})
+            return
+        self.server.store.add_scores(entries)
+        self.server.store.add_ghosts(runs)
+        self.send_json(200, {"accepted": len(entries)})
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path not in ("/top", "/ghosts"):
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            if url.path == "/top":
+                data = {"top": self.server.store.top(int(query.get("n", [LEADERBOARD_TOP_N])[0]))}
+            else:
+                course, n = int(query["course"][0]), int(query.get("n", [GHOST_COUNT])[0])
+                data = {"ghosts": self.server.store.top_ghosts(course, n)}
+        except (ValueError, KeyError):
+            self.send_json(400, {"error": "bad request"})
+            return
+        self.send_json(200, data)
+
+    def send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, filename: str = None, verbose: bool = False) -> ThreadingHTTPServer:
+    """Create a local leaderboard server. Use port 0 to pick a free port."""
+    server = ThreadingHTTPServer((host, port), LeaderboardHandler)
+    server.daemon_threads = True
+    server.store = ScoreStore(filename)
+    server.verbose = verbose
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the central leaderboard.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default="leaderboard.json", help="file where the scores are kept")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.data, args.verbose)
+    print(f"Leaderboard listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.store.save_data()
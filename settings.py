@@ -10,6 +10,29 @@ FRAMERATE: int = 60
 # Motion
 GRAVITY: float = 600.
 JUMPING_HEIGHT: float = 400.
+ROTATION_FACTOR: float = 0.06
+
+# Obstacles
+OBSTACLE_INTERVAL: float = 1.4
 
 # Save
-SAVE_FILE: str = "save.json"
\ No newline at end of file
+SAVE_FILE: str = "save.json"
+
+# Leaderboard
+# Empty URL keeps the ranking local (save.json only)
+LEADERBOARD_URL: str = ""
+LEADERBOARD_QUEUE_FILE: str = "leaderboard_queue.json"
+LEADERBOARD_TOP_N: int = 10
+LEADERBOARD_BATCH_SIZE: int = 50
+LEADERBOARD_FLUSH_INTERVAL: float = 2.
+LEADERBOARD_REFRESH_INTERVAL: float = 30.
+LEADERBOARD_TIMEOUT: float = 5.
+LEADERBOARD_MAX_BACKOFF: float = 60.
+
+# Ghosts
+GHOST_FILE: str = "ghosts.json"
+GHOST_COUNT: int = 3
+GHOST_TICK: float = 1 / 30
+GHOST_ALPHA: int = 100
+GHOST_ANGLE_STEP: float = 3.
+GHOST_MAX_ANGLE: float = 90.
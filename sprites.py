@@ -1,5 +1,4 @@
 import pygame
-from random import choice, randint
 
 from settings import *
 
@@ -100,7 +99,7 @@ class Plane(pygame.sprite.Sprite):
         self.image = self.frames[int(self.frame_index)]
 
     def rotate(self) -> None:
-        rotated_img = pygame.transform.rotozoom(self.image, -self.direction * 0.06, 1.)
+        rotated_img = pygame.transform.rotozoom(self.image, -self.direction * ROTATION_FACTOR, 1.)
         self.image = rotated_img
         self.mask = pygame.mask.from_surface(self.image)
     
@@ -112,25 +111,80 @@ class Plane(pygame.sprite.Sprite):
         self.step(dt)
         self.animate(dt)
         self.rotate()
+
+
+class GhostFrames():
+    """This class holds the plane frames used by every ghost.
+
+    Each (frame, angle) pair is rotated and made translucent once, the first time it is needed.
+    The angle is rounded to GHOST_ANGLE_STEP degrees to keep the cache small.
+    """
+    def __init__(self, frames: list, alpha: int = GHOST_ALPHA) -> None:
+        self.frames: list = frames
+        self.alpha: int = alpha
+        self.cache: dict = {}
+
+    def get(self, frame_index: int, direction: float):
+        angle = max(-GHOST_MAX_ANGLE, min(GHOST_MAX_ANGLE, -direction * ROTATION_FACTOR))
+        key = (frame_index, round(angle / GHOST_ANGLE_STEP))
+        image = self.cache.get(key)
+        if image is None:
+            image = pygame.transform.rotozoom(self.frames[frame_index], key[1] * GHOST_ANGLE_STEP, 1.).convert_alpha()
+            image.set_alpha(self.alpha)
+            self.cache[key] = image
+        return image
+
+
+class Ghost(pygame.sprite.Sprite):
+    """This class handles the sprite of a ghost, the replay of a recorded run.
+
+    The position is read from the trajectory and the image from the shared GhostFrames,
+    so no physics, rotation or mask is computed per frame.
+    """
+    def __init__(self, group, trajectory, ghost_frames: GhostFrames) -> None:
+        super().__init__(group)
+        self.sprite_type: str = "ghost"
+        self.trajectory = trajectory
+        self.ghost_frames: GhostFrames = ghost_frames
+        self.time: float = 0.
+        self.frame_index: float = 0.
+        # Image
+        self.image = self.ghost_frames.get(0, 0.)
+        # Rect
+        self.rect = self.ghost_frames.frames[0].get_rect(midleft=(GAME_W//20, GAME_H//2))
+
+    def update(self, dt) -> None:
+        self.time += dt
+        sample = self.trajectory.sample(self.time)
+        if sample is None:
+            self.kill()
+            return
+        y, direction = sample
+        self.frame_index = (self.frame_index + 8 * dt) % len(self.ghost_frames.frames)
+        self.image = self.ghost_frames.get(int(self.frame_index), direction)
+        self.rect.y = round(y)
         
 
 class Obstacle(pygame.sprite.Sprite):
-    """This class handles the sprite of obstacles."""
-    def __init__(self, group, img_dir: str):
+    """This class handles the sprite of obstacles.
+
+    Positions come from the given random.Random, so a seed always gives the same course.
+    """
+    def __init__(self, group, img_dir: str, rng):
         super().__init__(group)
         self.sprite_type: str = "obstacle"
-        orientation = choice(('up', 'down'))
+        orientation = rng.choice(('up', 'down'))
         self.img_dir: str = img_dir
-        surf = pygame.image.load(self.img_dir + f'/{choice((0, 1))}.png').convert_alpha()
+        surf = pygame.image.load(self.img_dir + f'/{rng.choice((0, 1))}.png').convert_alpha()
         self.image = pygame.transform.scale(surf, pygame.math.Vector2(surf.get_size()))
         
 		# Position
-        x = GAME_W + randint(40,100)
+        x = GAME_W + rng.randint(40,100)
         if orientation == 'up':
-            y = GAME_H + randint(10,50)
+            y = GAME_H + rng.randint(10,50)
             self.rect = self.image.get_rect(midbottom = (x, y))
         else:
-            y = randint(-50,-10)
+            y = rng.randint(-50,-10)
             self.image = pygame.transform.flip(self.image, False, True)
             self.rect = self.image.get_rect(midtop = (x, y))
             
@@ -1,4 +1,5 @@
 import pygame
+import random
 
 from sprites import *
 from settings import *
@@ -151,9 +152,10 @@ class RankingMenu(State):
 		surface.fill((0, 0, 0))
 		# Sprites
 		self.prev_state.sprites.draw(surface)	
-		if bool(self.game.sl_manager.ranking):
-			for i, (k, v) in enumerate(zip(self.game.sl_manager.ranking.keys(), self.game.sl_manager.ranking.values())):
-				text = str(len(self.game.sl_manager.ranking) - i) + ". " + str(k) + ": " + str(v)
+		ranking = self.game.get_ranking()
+		if bool(ranking):
+			for i, (k, v) in enumerate(zip(ranking.keys(), ranking.values())):
+				text = str(len(ranking) - i) + ". " + str(k) + ": " + str(v)
 				pos_y = GAME_H//2 - i * 32
 				self.game.draw_text(surface, text, (0, 0, 0), GAME_W//2, pos_y)
 		else:
@@ -204,10 +206,10 @@ class GameWorld(State):
 		bg = Background(self.all_sprites, self.game.graphics_dir + "/environment/background.png")
 		self.scale_factor = bg.scale_factor
 		Ground([self.all_sprites, self.collision_sprites], self.game.graphics_dir + "/environment/ground.png", self.scale_factor)
+		# Ghosts share the course and the plane frames
+		self.ghosts = pygame.sprite.Group()
+		self.ghost_frames = None
 		self.reset()
-		# Timer Event 
-		self.obstacle_timer = pygame.USEREVENT + 1
-		pygame.time.set_timer(self.obstacle_timer, 1400)
 
 		# State
 		self.go_to_pause = False
@@ -215,8 +217,11 @@ class GameWorld(State):
 	
 	def update(self, dt, events):
 		super().update(dt, events)
+		self.spawn_obstacles(dt)
 		self.all_sprites.update(dt)
 		self.player.update(dt)
+		self.ghosts.update(dt)
+		self.game.trajectory.record(dt, self.plane.pos.y)
 		self.check_collision()
 		self.game.update_score()
 		self.transition_state()
@@ -229,8 +234,13 @@ class GameWorld(State):
 				self.go_to_pause = True
 			if event.key == pygame.K_SPACE:
 				self.plane.jump()
-		if event.type == self.obstacle_timer:
-			Obstacle([self.all_sprites, self.collision_sprites], self.game.graphics_dir + "/obstacles")
+	
+	def spawn_obstacles(self, dt):
+		# Obstacles follow the game time, not the wall clock, so the course doesn't depend on pauses
+		self.obstacle_time += dt
+		while self.obstacle_time >= OBSTACLE_INTERVAL:
+			self.obstacle_time -= OBSTACLE_INTERVAL
+			Obstacle([self.all_sprites, self.collision_sprites], self.game.graphics_dir + "/obstacles", self.course)
 	
 	def check_collision(self):
 		if pygame.sprite.spritecollide(self.plane, self.collision_sprites, False, pygame.sprite.collide_mask) \
@@ -247,6 +257,7 @@ class GameWorld(State):
 		# Sprites
 		self.all_sprites.draw(surface)
 		self.game.draw_text(surface, str(self.game.score), (0, 0, 0), GAME_W//2, GAME_H//10)
+		self.ghosts.draw(surface)
 		self.player.draw(surface)
 		
 	def transition_state(self):
@@ -264,7 +275,14 @@ class GameWorld(State):
 	
 	def reset(self):
 		self.game.reset_score()
+		self.course = random.Random(self.game.course_seed)
+		self.obstacle_time = 0.
 		self.plane = Plane(self.player, self.game.graphics_dir + "/plane", self.game.sound_dir, self.scale_factor / 1.7)
+		if self.ghost_frames is None:
+			self.ghost_frames = GhostFrames(self.plane.frames)
+		self.ghosts.empty()
+		for trajectory in self.game.ghost_trajectories():
+			Ghost(self.ghosts, trajectory, self.ghost_frames)
 
 
 class FailedMenu(State):